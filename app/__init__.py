@@ -24,5 +24,6 @@ __VERSION__ = "0.1.0"
 # make the imports for library users easier
 from .schemas.core import ModelGenerator as Model
 from .core.handlers.base import BaseCRUD as CRUD
+from .responses import ORJSONResponse
 
 MakeModel = Model.make_model
\ No newline at end of file
@@ -1,12 +1,23 @@
 from datetime import datetime, timezone
 from typing import Any, Generic, List, Type, TypeVar
 
+import msgspec
 from bson import ObjectId
 from fastapi import HTTPException
 from motor.motor_asyncio import AsyncIOMotorDatabase
 from pydantic import BaseModel
+from pymongo import IndexModel, InsertOne, UpdateOne
 
-from app.local_typing import AgnosticCursor, DBDeleteResult, DBInsertOneResult, DBUpdateResult, DBInsertManyResult
+from app.responses import encode_json
+from app.schemas.mongo import FromMongoFast
+from app.local_typing import (
+    AgnosticCollection,
+    AgnosticCursor,
+    DBBulkWriteResult,
+    DBInsertOneResult,
+    DBUpdateResult,
+    DBInsertManyResult,
+)
 
 CreateSchema = TypeVar("CreateSchema", bound=BaseModel)
 ReadSchema = TypeVar("ReadSchema", bound=BaseModel)
@@ -14,17 +25,50 @@ UpdateSchema = TypeVar("UpdateSchema", bound=BaseModel)
 
 
 class BaseCRUD(Generic[CreateSchema, ReadSchema, UpdateSchema]):
+    class Meta:
+        # created by ensure_indexes, then used to hint get_multiple
+        indexes: list[IndexModel] = []
+        # reject sort_by fields no index covers, meant for development
+        strict_sort: bool = False
+
     def __init__(
         self,
         collection: str,
         read_model: Type[ReadSchema],
         make_time_stamps: bool = True,
         soft_delete: bool = False,
+        trust_db: bool = True,
+        read_struct: Type[FromMongoFast] | None = None,
     ):
         self._collection = collection
         self._read_model = read_model
         self._make_time_stamps = make_time_stamps
         self._soft_delete = soft_delete
+        self._trust_db = trust_db
+        self._read_struct = read_struct
+        # only fetch what the read model uses
+        self._projection = {field.alias or name: 1 for name, field in read_model.model_fields.items()}
+        # filled in for fields a stored document lacks, like model_construct would
+        self._read_defaults = {
+            field.alias or name: field.default
+            for name, field in read_model.model_fields.items()
+            if not field.is_required() and field.default_factory is None
+        }
+        # stored keys renamed to the field names the read model dumps
+        self._read_aliases = {
+            field.alias: name for name, field in read_model.model_fields.items() if field.alias and field.alias != name
+        }
+        self._struct_projection = (
+            {field.encode_name: 1 for field in msgspec.structs.fields(read_struct)} if read_struct else None
+        )
+        self._indexes: list[IndexModel] = list(getattr(self.Meta, "indexes", []))
+        self._strict_sort: bool = getattr(self.Meta, "strict_sort", False)
+        self._index_keys: list[tuple[str, ...]] = [tuple(index.document["key"]) for index in self._indexes]
+        # names of the indexes ensure_indexes confirmed, only those are safe to hint
+        self._created_indexes: set[str] = set()
+        # last database seen and its collection handle
+        self._db: AsyncIOMotorDatabase | None = None
+        self._db_collection: AgnosticCollection | None = None
 
     async def on_create(self) -> None:
         pass
@@ -35,16 +79,24 @@ class BaseCRUD(Generic[CreateSchema, ReadSchema, UpdateSchema]):
     async def on_delete(self) -> None:
         pass
 
-    async def id_exists(self, id: str, db: AsyncIOMotorDatabase) -> bool:
-        item = await db.get_collection(self._collection).find_one({"_id": ObjectId(id)})
+    async def ensure_indexes(self, db: AsyncIOMotorDatabase) -> list[str]:
+        """Create the indexes declared in `Meta.indexes`, meant to run at startup."""
+        if not self._indexes:
+            return []
+        names = await self._coll(db).create_indexes(self._indexes)
+        self._created_indexes.update(names)
+        return names
+
+    async def id_exists(self, id: ObjectId | str, db: AsyncIOMotorDatabase) -> bool:
+        item = await self._coll(db).find_one({"_id": self._to_oid(id)}, projection={"_id": 1})
         return item is not None
 
-    async def find_and_is_soft_deleted(self, id: str, db: AsyncIOMotorDatabase) -> bool:
+    async def find_and_is_soft_deleted(self, id: ObjectId | str, db: AsyncIOMotorDatabase) -> bool:
         """
         Find an item by its ID in the database and check if it is marked as soft deleted.
 
         Args:
-            id (str): The ID of the item to find.
+            id (ObjectId | str): The ID of the item to find.
             db (AsyncIOMotorDatabase): The database to search in.
 
         Returns:
@@ -53,33 +105,102 @@ class BaseCRUD(Generic[CreateSchema, ReadSchema, UpdateSchema]):
         Raises:
             HTTPException: If the item with the given ID is not found.
         """
-        item: dict = await db.get_collection(self._collection).find_one({"_id": ObjectId(id)})
+        item: dict = await self._coll(db).find_one(
+            {"_id": self._to_oid(id)}, projection={"is_deleted": 1}
+        )
         if item is None:
             raise HTTPException(status_code=404, detail="Item with {id} not found")
         return item.get("is_deleted", False)
         
     
-    async def count(self, db: AsyncIOMotorDatabase) -> int:
-        return await db.get_collection(self._collection).count_documents({})
+    async def count(self, db: AsyncIOMotorDatabase, exact: bool = False) -> int:
+        """
+        Count the documents in the collection.
+
+        Args:
+            db (AsyncIOMotorDatabase): The database to count in.
+            exact (bool): Scan the collection instead of reading its metadata, which can
+                be off after an unclean shutdown or during orphaned chunk migrations.
+
+        Returns:
+            int: The number of documents.
+        """
+        if exact:
+            return await self._coll(db).count_documents({})
+        return await self._coll(db).estimated_document_count()
 
     async def get_multiple(
         self, db: AsyncIOMotorDatabase, sort_by: str | None = None, n=100, **filters
-    ) -> List:
-        items_cursor: AgnosticCursor = db.get_collection(self._collection).find(filters)
+    ) -> List[ReadSchema] | List[FromMongoFast]:
+        sort_index = self._sort_index(sort_by, filters) if sort_by else None
+        if sort_by and self._strict_sort and sort_index is None:
+            raise ValueError(f"No index covers sorting by {sort_by!r}")
+        projection = self._struct_projection if self._read_struct is not None else self._projection
+        items_cursor: AgnosticCursor = self._coll(db).find(filters, projection=projection)
         if sort_by:
             items_cursor = items_cursor.sort(sort_by)
+            if sort_index is not None and sort_index in self._created_indexes:
+                items_cursor = items_cursor.hint(sort_index)
         items_cursor = items_cursor.limit(n)
-        items: list = await items_cursor.to_list(n)
-        return items
+        # build the results while streaming instead of materialising raw documents first
+        if self._read_struct is not None:
+            return [self._read_struct.decode_doc(item) async for item in items_cursor]
+        return [self._to_read_model(item) async for item in items_cursor]
 
-    async def get_by_id(self, id: str, db: AsyncIOMotorDatabase) -> ReadSchema:
-        item = await db.get_collection(self._collection).find_one({"_id": ObjectId(id)})
-        if item is None:
-            raise HTTPException(status_code=404, detail="Item with {id} not found")
-        return self._read_model(**item)
+    async def get_by_id(self, id: ObjectId | str, db: AsyncIOMotorDatabase) -> ReadSchema:
+        return self._to_read_model(await self._find_by_id(self._to_oid(id), db))
+
+    async def get_by_id_json(self, id: ObjectId | str, db: AsyncIOMotorDatabase) -> bytes:
+        """
+        Fetch an item by its ID already encoded as JSON, skipping the read model entirely.
+
+        Meant for trusted read endpoints that hand the bytes straight to a `Response`.
+
+        Args:
+            id (ObjectId | str): The ID of the item to fetch.
+            db (AsyncIOMotorDatabase): The database to search in.
+
+        Returns:
+            bytes: The projected document as JSON, with `_id` as a string under `id` and the
+                read model's defaults for fields the document lacks.
+
+        Raises:
+            HTTPException: If the item with the given ID is not found.
+        """
+        item = await self._find_by_id(self._to_oid(id), db)
+        # same keys as the read model dumps
+        item = {**self._read_defaults, **item}
+        item["_id"] = str(item["_id"])
+        for alias, name in self._read_aliases.items():
+            if alias in item:
+                item[name] = item.pop(alias)
+        return encode_json(item)
+
+    async def get_many_by_ids(
+        self, ids: list[ObjectId | str], db: AsyncIOMotorDatabase
+    ) -> List[ReadSchema] | List[FromMongoFast]:
+        """
+        Fetch several items by ID in a single query, missing IDs are skipped.
+
+        Args:
+            ids (list[ObjectId | str]): The IDs of the items to fetch.
+            db (AsyncIOMotorDatabase): The database to search in.
+
+        Returns:
+            List[ReadSchema] | List[FromMongoFast]: The items found, in no particular order,
+                as `read_struct` instances when the handler has one.
+        """
+        oids = [self._to_oid(id) for id in ids]
+        projection = self._struct_projection if self._read_struct is not None else self._projection
+        items_cursor: AgnosticCursor = (
+            self._coll(db).find({"_id": {"$in": oids}}, projection=projection).hint("_id_")
+        )
+        if self._read_struct is not None:
+            return [self._read_struct.decode_doc(item) async for item in items_cursor]
+        return [self._to_read_model(item) async for item in items_cursor]
 
     async def create(self, item: CreateSchema, db: AsyncIOMotorDatabase, **defaults_fields: Any) -> str:
-        item_updated = item.model_dump()
+        item_updated = item.__pydantic_serializer__.to_python(item, by_alias=False)
         if defaults_fields:
             item_updated.update(defaults_fields)
         result = await self._create(item_updated, db)
@@ -87,30 +208,80 @@ class BaseCRUD(Generic[CreateSchema, ReadSchema, UpdateSchema]):
         return str(result.inserted_id)  # type: ignore
     
     async def create_many(self, items: list[CreateSchema], db: AsyncIOMotorDatabase, **defaults_fields: Any) -> list[str]:
-        items_updated = [item.model_dump() for item in items]
+        items_updated = [item.__pydantic_serializer__.to_python(item, by_alias=False) for item in items]
         if defaults_fields:
-            items_updated = [{**item, **defaults_fields} for item in items_updated]
+            # the dumped dicts are fresh, so update them in place rather than copying
+            for item_updated in items_updated:
+                item_updated |= defaults_fields
         result = await self._create_many(items_updated, db)
         await self.on_create()
         return [str(id) for id in result.inserted_ids]
 
-    async def update(self, id: str, item: UpdateSchema, db: AsyncIOMotorDatabase) -> bool:
-        if await self.id_exists(id, db):
-            result = await self._update(
-                id, item.model_dump(exclude_none=True, exclude_defaults=True, exclude_unset=True), db
-            )
-            await self.on_update()
-            return result.acknowledged
-        else:
+    async def update(self, id: ObjectId | str, item: UpdateSchema, db: AsyncIOMotorDatabase) -> bool:
+        item_dict = item.__pydantic_serializer__.to_python(
+            item, by_alias=False, exclude_none=True, exclude_defaults=True, exclude_unset=True
+        )
+        result = await self._update(self._to_oid(id), item_dict, db)
+        if result.matched_count == 0:
             return False
+        await self.on_update()
+        return True
 
-    async def delete(self, id: str, db: AsyncIOMotorDatabase) -> bool:
-        if await self.id_exists(id, db):
-            result = await self._delete(id, db)
-            await self.on_delete()
-            return result.acknowledged
-        else:
+    async def delete(self, id: ObjectId | str, db: AsyncIOMotorDatabase) -> bool:
+        if not await self._delete(self._to_oid(id), db):
             return False
+        await self.on_delete()
+        return True
+
+    async def bulk_upsert(self, ops: list[InsertOne | UpdateOne], db: AsyncIOMotorDatabase) -> DBBulkWriteResult:
+        """
+        Run mixed insert/update operations in a single unordered bulk write.
+
+        Args:
+            ops (list[InsertOne | UpdateOne]): The write operations to run.
+            db (AsyncIOMotorDatabase): The database connection.
+
+        Returns:
+            DBBulkWriteResult: The result of the bulk write.
+        """
+        return await self._coll(db).bulk_write(ops, ordered=False)
+
+    def _coll(self, db: AsyncIOMotorDatabase) -> AgnosticCollection:
+        if db is not self._db:
+            self._db_collection = db.get_collection(self._collection)
+            self._db = db
+        return self._db_collection  # type: ignore
+
+    @staticmethod
+    def _to_oid(id: ObjectId | str) -> ObjectId:
+        return id if isinstance(id, ObjectId) else ObjectId(id)
+
+    async def _find_by_id(self, oid: ObjectId, db: AsyncIOMotorDatabase) -> dict[str, Any]:
+        item = await self._coll(db).find_one({"_id": oid}, projection=self._projection)
+        if item is None:
+            raise HTTPException(status_code=404, detail=f"Item with {oid} not found")
+        return item
+
+    def _sort_index(self, sort_by: str, filters: dict[str, Any]) -> str | None:
+        """Name of a declared index that can serve the sort, i.e. `sort_by` follows only filtered keys."""
+        for index, keys in zip(self._indexes, self._index_keys):
+            if sort_by in keys and all(key in filters for key in keys[: keys.index(sort_by)]):
+                return index.document["name"]
+        return None
+
+    def _to_read_model(self, item: dict[str, Any]) -> ReadSchema:
+        """
+        Build the read model from a raw mongo document.
+
+        Documents coming out of the database are already typed, so when the handler
+        trusts the database validation is skipped with `model_construct`. Validators
+        don't run in that case, hence the ObjectId is stringified here.
+        """
+        if not self._trust_db:
+            return self._read_model(**item)
+        if "_id" in item:
+            item["_id"] = str(item["_id"])
+        return self._read_model.model_construct(**item)
 
     # Would invoke time stamps if enabled
     async def _create(self, item_dict: dict[str, Any], db: AsyncIOMotorDatabase) -> DBInsertOneResult:
@@ -120,47 +291,62 @@ class BaseCRUD(Generic[CreateSchema, ReadSchema, UpdateSchema]):
     
     async def _create_many(self, items_dict: list[dict[str, Any]], db: AsyncIOMotorDatabase) -> DBInsertManyResult:
         if self._make_time_stamps:
+            # one timestamp for the whole batch
+            now = datetime.now(timezone.utc)
             for item_dict in items_dict:
-                item_dict["created_at"] = item_dict["updated_at"] = datetime.now(timezone.utc)
-        return await db.get_collection(self._collection).insert_many(items_dict)
+                item_dict["created_at"] = item_dict["updated_at"] = now
+        if not items_dict:
+            return DBInsertManyResult([], True)
+        # the driver splits oversized batches itself
+        return await self._coll(db).insert_many(items_dict, ordered=False)
 
-    async def _update(self, id: str, item_dict: dict[str, Any], db: AsyncIOMotorDatabase) -> DBUpdateResult:
+    async def _update(self, id: ObjectId | str, item_dict: dict[str, Any], db: AsyncIOMotorDatabase) -> DBUpdateResult:
         if self._make_time_stamps:
             item_dict["updated_at"] = datetime.now(timezone.utc)
         return await self.__update(id, item_dict, db)
 
-    async def _delete(self, id: str, db: AsyncIOMotorDatabase) -> DBDeleteResult | DBUpdateResult:
+    async def _delete(self, id: ObjectId | str, db: AsyncIOMotorDatabase) -> bool:
         """
         Deletes a document from the collection based on the provided ID.
 
+        With soft deletion enabled the document is only marked as deleted, deleting
+        an already soft deleted document removes it permanently.
+
         Args:
-            id (str): The ID of the document to be deleted.
+            id (ObjectId | str): The ID of the document to be deleted.
             db (AsyncIOMotorDatabase): The database connection.
 
         Returns:
-            DBDeleteResult | DBUpdateResult: The result of the delete operation.
+            bool: True if a document was deleted or marked as deleted, False if none matched.
         """
-        if self.find_and_is_soft_deleted(id, db):
-            return await db.get_collection(self._collection).delete_one({"_id": ObjectId(id)})
+        oid = self._to_oid(id)
+        collection = self._coll(db)
         if self._soft_delete:
-            update_fields: dict[str,Any] = {"deleted": True}
+            update_fields: dict[str, Any] = {"is_deleted": True, "deleted_at": datetime.now(timezone.utc)}
             if self._make_time_stamps:
-                update_fields["updated_at"] = datetime.now(timezone.utc)
-            return await db.get_collection(self._collection).update_one(
-                {"_id": ObjectId(id)},
+                update_fields["updated_at"] = update_fields["deleted_at"]
+            item = await collection.find_one_and_update(
+                {"_id": oid, "is_deleted": {"$ne": True}},
                 {"$set": update_fields},
+                projection={"_id": 1},
             )
-        return await db.get_collection(self._collection).delete_one({"_id": ObjectId(id)})
+            if item is not None:
+                return True
+            # Either missing or already soft deleted, the latter gets removed for good
+            result = await collection.delete_one({"_id": oid, "is_deleted": True})
+            return result.deleted_count > 0
+        result = await collection.delete_one({"_id": oid})
+        return result.deleted_count > 0
     
     
     # Won't invoke time stamps no matter what
     #  This is for internal use only, only use to avoid functions triggered by events a
     async def __create(self, item_dict: dict[str, Any], db: AsyncIOMotorDatabase) -> DBInsertOneResult:
-        return await db.get_collection(self._collection).insert_one(item_dict)
+        return await self._coll(db).insert_one(item_dict)
     
-    async def __update(self, id: str, item_dict: dict[str, Any], db: AsyncIOMotorDatabase) -> DBUpdateResult:
-        return await db.get_collection(self._collection).update_one(
-            {"_id": ObjectId(id)}, {"$set": item_dict}
+    async def __update(self, id: ObjectId | str, item_dict: dict[str, Any], db: AsyncIOMotorDatabase) -> DBUpdateResult:
+        return await self._coll(db).update_one(
+            {"_id": self._to_oid(id)}, {"$set": item_dict}
         )
         
     
@@ -36,15 +36,15 @@
 #         if item:
 #             return PrivateReadUser(**item)
 
-#     def handle_password(self, user: CreateUser) -> CreateUserInternal:
-#         user.password = security.hash_password(user.password)
+#     async def handle_password(self, user: CreateUser) -> CreateUserInternal:
+#         user.password = await security.hash_password(user.password)
 #         del user.confirm_password
 #         return user
 
 #     async def register_user(self, user: CreateUser, db: AsyncIOMotorDatabase) -> Any:
 #         if await self.email_exists(user.email, db):
 #             raise HTTPException(status_code=409, detail="EMAIL_ALREADY_REGISTERED")
-#         user_to_db = self.handle_password(user)
+#         user_to_db = await self.handle_password(user)
 #         user_in_db = await self.create(
 #             user_to_db,
 #             db,
@@ -21,4 +21,8 @@ URI = "mongodb://localhost:27017"
 #         yield db
 #         print("Mongo connection closed.")
 
-db = AsyncIOMotorClient(URI)["libtest"]
\ No newline at end of file
+# Size the pool for concurrent requests rather than pymongo's default of 100,
+# the server has to hold a connection (and its memory) for each one.
+MAX_POOL_SIZE = 50
+
+db = AsyncIOMotorClient(URI, maxPoolSize=MAX_POOL_SIZE)["libtest"]
\ No newline at end of file
@@ -1,32 +1,26 @@
 from datetime import datetime, timezone
-from typing import Any, Literal, Type
+from typing import Annotated, Literal, Type
 
-from pydantic import BaseModel, Field, field_serializer
+from pydantic import BaseModel, Field, PlainSerializer
 
 from app.schemas.mongo import FromMongo
 
+IsoDatetime = Annotated[datetime, PlainSerializer(datetime.isoformat, return_type=str, when_used="json-unless-none")]
 
-class Timestamp(BaseModel):
-    created_at: datetime = Field(default_factory= lambda: datetime.now(timezone.utc))
-    updated_at: datetime | None = Field(default=None)
 
-    @field_serializer("created_at")
-    def serialize_dt(self, created_at: datetime | None, _info: Any) -> str | None:
-        return created_at.isoformat() if created_at is not None else None
+def _utcnow() -> datetime:
+    return datetime.now(timezone.utc)
+
 
-    @field_serializer("updated_at")
-    def serialize_updated_at(self, updated_at: datetime | None, _info: Any) -> str | None:
-        return updated_at.isoformat() if updated_at is not None else None
+class Timestamp(BaseModel):
+    created_at: IsoDatetime = Field(default_factory=_utcnow)
+    updated_at: IsoDatetime | None = Field(default=None)
 
 
 class SoftDeletion(BaseModel):
-    deleted_at: datetime | None = Field(default=None)
+    deleted_at: IsoDatetime | None = Field(default=None)
     is_deleted: bool = False
 
-    @field_serializer("deleted_at")
-    def serialize_dates(self, deleted_at: datetime | None, _info: Any) -> str | None:
-        return deleted_at.isoformat() if deleted_at is not None else None
-
 
 class ModelGenerator:
     def __init__(
@@ -1,18 +1,28 @@
-from typing import Any
+from typing import Annotated, Any, Type, TypeVar
+
+import msgspec
 from bson import ObjectId
-from pydantic import BaseModel, ConfigDict, Field, field_serializer, validator
+from pydantic import BaseModel, BeforeValidator, ConfigDict, Field
+
+
+def _oid_to_str(id: Any) -> Any:
+    return str(id) if isinstance(id, ObjectId) else id
 
 
 class FromMongo(BaseModel):
-    id: str | ObjectId = Field(alias="_id")
-    model_config = ConfigDict(arbitrary_types_allowed=True, extra="ignore")
-    
-    @validator('id', pre=True)
-    def validate_id(cls, id: str | ObjectId) -> str:
-        return str(id) if isinstance(id, ObjectId) else id
-    
-    # @field_serializer('id')
-    # def serialize_id(self, id: str | ObjectId) -> str:
-    #     if isinstance(id, ObjectId):
-    #         return str(id)
-    #     return id
\ No newline at end of file
+    id: Annotated[str, BeforeValidator(_oid_to_str), Field(alias="_id")]
+    model_config = ConfigDict(populate_by_name=True, extra="ignore", defer_build=False)
+
+
+FastSchema = TypeVar("FastSchema", bound="FromMongoFast")
+
+
+class FromMongoFast(msgspec.Struct, rename={"id": "_id"}):
+    """msgspec mirror of `FromMongo`, for callers that only need a struct."""
+
+    id: str
+
+    @classmethod
+    def decode_doc(cls: Type[FastSchema], doc: dict[str, Any]) -> FastSchema:
+        doc["_id"] = str(doc["_id"])
+        return msgspec.convert(doc, cls)
@@ -0,0 +1,41 @@
+import asyncio
+
+from argon2 import PasswordHasher
+from argon2.exceptions import InvalidHashError, VerificationError
+
+# argon2id, the C core picks the SIMD BLAKE2b implementation when the CPU supports it
+password_hasher = PasswordHasher()
+
+
+async def hash_password(password: str) -> str:
+    """
+    Hash a password with argon2id without blocking the event loop.
+
+    Args:
+        password (str): The plain text password.
+
+    Returns:
+        str: The encoded argon2 hash.
+    """
+    return await asyncio.to_thread(password_hasher.hash, password)
+
+
+def _verify_password(password: str, hashed_password: str) -> bool:
+    try:
+        return password_hasher.verify(hashed_password, password)
+    except (VerificationError, InvalidHashError):
+        return False
+
+
+async def verify_password(password: str, hashed_password: str) -> bool:
+    """
+    Check a password against its argon2 hash without blocking the event loop.
+
+    Args:
+        password (str): The plain text password.
+        hashed_password (str): The stored hash.
+
+    Returns:
+        bool: True if the password matches, False otherwise.
+    """
+    return await asyncio.to_thread(_verify_password, password, hashed_password)
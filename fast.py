@@ -1,9 +1,12 @@
 """example usage"""
 
+from contextlib import asynccontextmanager
+
 import uvicorn
-from fastapi import FastAPI
+from fastapi import FastAPI, Response
+from pymongo import ASCENDING, IndexModel
 
-from app import CRUD, MakeModel
+from app import CRUD, MakeModel, ORJSONResponse
 from app.database.mongo import db
 
 
@@ -17,6 +20,10 @@ class UserRead(MakeModel("read", persistent_delete=True, time_stamp=True)):
     age: int
 
 class UserHandler(CRUD[User, UserRead, UserRead]):
+    class Meta:
+        indexes = [IndexModel([("age", ASCENDING)]), IndexModel([("name", ASCENDING), ("age", ASCENDING)])]
+        strict_sort = True
+
     def __init__(self):
         super().__init__("testusers", UserRead)
 
@@ -29,9 +36,16 @@ class UserHandler(CRUD[User, UserRead, UserRead]):
     async def on_delete(self):
         print("on_delete")
         
-user_handler = UserHandler
+user_handler = UserHandler()
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    await user_handler.ensure_indexes(db)
+    yield
+
 
-tapp = FastAPI()
+tapp = FastAPI(default_response_class=ORJSONResponse, lifespan=lifespan)
 
 
 @tapp.get("/")
@@ -41,12 +55,12 @@ async def root():
 
 @tapp.post("/user")
 async def create_user(user: User):
-    return await user_handler.create(user, db)
+    return ORJSONResponse(await user_handler.create(user, db))
 
 
 @tapp.get("/user/{user_id}")
 async def get_user(user_id: str):
-    return (await user_handler.get_by_id(user_id, db)).model_dump()
+    return Response(await user_handler.get_by_id_json(user_id, db), media_type="application/json")
 
 
 if __name__ == "__main__":